@@ -1,7 +1,7 @@
 """The Ensto BLE integration."""
 import asyncio
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from bleak_retry_connector import BleakError, close_stale_connections, get_device, BLEAK_EXCEPTIONS
 
@@ -11,16 +11,42 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_ADDRESS, EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-
-from .const import DOMAIN, UPDATE_SECONDS, DEVICE_TIMEOUT
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    CONF_PROFILING,
+    CONF_SLOW_THRESHOLD_MS,
+    DATA_DELTA_STREAM,
+    DATA_LOOP_LAG,
+    DEFAULT_SLOW_THRESHOLD_MS,
+    DEVICE_TIMEOUT,
+    DOMAIN,
+    UPDATE_SECONDS,
+    WATCHDOG_SECONDS,
+)
+from .dataclasses import EnstoThermostatState
 from .models import ThermostatData, EnstoThermostatLE
+from .profiler import KIND_REFRESH, EnstoProfiler, LoopLagSampler
+from .services import async_setup_services
+from .stream import EnstoDeltaStream, async_setup_stream
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Ensto integration services."""
+    async_setup_services(hass)
+    async_setup_stream(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up LD2410 BLE from a config entry."""
     address: str = entry.data[CONF_ADDRESS]
@@ -36,6 +62,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     ensto_therm = EnstoThermostatLE(ble_device)
 
+    profiler: EnstoProfiler | None = None
+    if entry.options.get(CONF_PROFILING, False):
+        profiler = EnstoProfiler(
+            address,
+            entry.options.get(CONF_SLOW_THRESHOLD_MS, DEFAULT_SLOW_THRESHOLD_MS)
+            / 1000,
+        )
+        ensto_therm.set_profiler(profiler)
+
     try:
         await ensto_therm.initialise()
     except BleakError as exc:
@@ -65,13 +100,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     async def _async_update():
         """Update the device state."""
         try:
-            await ensto_therm.update()
+            if profiler:
+                with profiler.measure(KIND_REFRESH, "coordinator"):
+                    await ensto_therm.update()
+            else:
+                await ensto_therm.update()
         except BLEAK_EXCEPTIONS as ex:
             raise UpdateFailed(str(ex)) from ex
 
 
     startup_event = asyncio.Event()
-    cancel_first_update = ensto_therm.register_callback(lambda *_: startup_event.set())
+
+    @callback
+    def _async_startup_update(_state: EnstoThermostatState) -> None:
+        """Signal that the first state has arrived."""
+        startup_event.set()
+
+    cancel_first_update = ensto_therm.register_callback(_async_startup_update)
     coordinator = DataUpdateCoordinator(
         hass,
         _LOGGER,
@@ -98,12 +143,54 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         cancel_first_update()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = ThermostatData(
-        entry.title, ensto_therm, coordinator
+        entry.title, ensto_therm, coordinator, profiler
     )
 
+    if profiler:
+        sampler: LoopLagSampler = hass.data.setdefault(
+            DATA_LOOP_LAG, LoopLagSampler(hass.loop)
+        )
+        sampler.add_user(entry.entry_id, profiler.slow_threshold)
+        entry.async_on_unload(lambda: sampler.remove_user(entry.entry_id))
+
+    stream: EnstoDeltaStream = hass.data[DATA_DELTA_STREAM]
+    stream.async_publish(ensto_therm.address, ensto_therm.state)
+
+    @callback
+    def _async_publish_delta(state: EnstoThermostatState) -> None:
+        """Publish the new state to the delta stream."""
+        stream.async_publish(ensto_therm.address, state)
+
+    entry.async_on_unload(ensto_therm.register_callback(_async_publish_delta))
+    entry.async_on_unload(lambda: stream.async_remove(ensto_therm.address))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
+    async def _async_watchdog(_now: datetime) -> None:
+        """Reconcile the device connection with the adapter."""
+        try:
+            result = await ensto_therm.reconcile_connection()
+        except BLEAK_EXCEPTIONS as ex:
+            _LOGGER.debug(
+                "%s: Watchdog failed to reconcile connection: %s",
+                ensto_therm.name,
+                ex,
+            )
+            return
+        if result.reclaimed:
+            _LOGGER.info(
+                "%s: Watchdog reclaimed stale connection state: %s",
+                ensto_therm.name,
+                result,
+            )
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_watchdog, timedelta(seconds=WATCHDOG_SECONDS)
+        )
+    )
+
     async def _async_stop(event: Event) -> None:
         """Close the connection."""
         await ensto_therm.stop()
@@ -117,10 +204,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     data: ThermostatData = hass.data[DOMAIN][entry.entry_id]
-    if entry.title != data.title:
+    if entry.title != data.title or _profiler_changed(entry, data.profiler):
         await hass.config_entries.async_reload(entry.entry_id)
 
 
+def _profiler_changed(entry: ConfigEntry, profiler: EnstoProfiler | None) -> bool:
+    """Return True if the profiling options no longer match the profiler."""
+    if not entry.options.get(CONF_PROFILING, False):
+        return profiler is not None
+    return profiler is None or profiler.slow_threshold != (
+        entry.options.get(CONF_SLOW_THRESHOLD_MS, DEFAULT_SLOW_THRESHOLD_MS) / 1000
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
@@ -14,8 +14,11 @@ from homeassistant.components.bluetooth import (
     async_discovered_service_info,
 )
 from homeassistant.const import CONF_ADDRESS
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
+from .const import CONF_PROFILING, CONF_SLOW_THRESHOLD_MS, DEFAULT_SLOW_THRESHOLD_MS
+
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -31,6 +34,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain="enstoheat"):
         self._discovery_info: BluetoothServiceInfoBleak | None = None
         self._discovered_devices: dict[str, BluetoothServiceInfoBleak] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> FlowResult:
@@ -106,3 +117,35 @@ class ConfigFlow(config_entries.ConfigFlow, domain="enstoheat"):
             data_schema=data_schema,
             errors=errors,
         )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Ensto options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the profiling options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_PROFILING,
+                    default=options.get(CONF_PROFILING, False),
+                ): bool,
+                vol.Optional(
+                    CONF_SLOW_THRESHOLD_MS,
+                    default=options.get(
+                        CONF_SLOW_THRESHOLD_MS, DEFAULT_SLOW_THRESHOLD_MS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=data_schema)
@@ -4,6 +4,9 @@ from typing import Final
 
 DOMAIN = "enstoheat"
 
+DATA_DELTA_STREAM = f"{DOMAIN}_delta_stream"
+DATA_LOOP_LAG = f"{DOMAIN}_loop_lag"
+
 DEVICE_TIMEOUT = 30
 
 MANUFACTURER_UUID = 0x2806
@@ -13,4 +16,17 @@ READ_BOOST_CHARACTERISTIC_UUID = "66AD3E6B-3135-4ADA-BB2B-8B22916B21D4"
 
 UPDATE_SECONDS = 10
 
+WATCHDOG_SECONDS = 300
+
+CONF_PROFILING = "profiling"
+CONF_SLOW_THRESHOLD_MS = "slow_threshold_ms"
+
+DEFAULT_SLOW_THRESHOLD_MS = 50
+
+SERVICE_BULK_CONTROL = "bulk_control"
+ATTR_OPERATION = "operation"
+ATTR_ADDRESSES = "addresses"
+
+BULK_ADAPTER_CONCURRENCY = 3
+
 DEFAULT_EFFECT_SPEED: Final = 50
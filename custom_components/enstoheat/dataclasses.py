@@ -12,3 +12,18 @@ class EnstoThermostatState:
     boost_on: bool = False
     boost_offset: float = 0
     boost_left: float = 0
+
+
+@dataclass(frozen=True)
+class ConnectionReapResult:
+    address: str
+    stale_client: bool = False
+    stale_links: int = 0
+    leaked_tasks: int = 0
+
+    @property
+    def reclaimed(self) -> bool:
+        """Return True if anything was reclaimed."""
+        return (
+            self.stale_client or self.stale_links > 0 or self.leaked_tasks > 0
+        )
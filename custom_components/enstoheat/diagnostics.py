@@ -0,0 +1,29 @@
+"""Diagnostics support for the Ensto integration."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_LOOP_LAG, DOMAIN
+from .models import ThermostatData
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: ThermostatData = hass.data[DOMAIN][entry.entry_id]
+    device = data.device
+    loop_lag = hass.data.get(DATA_LOOP_LAG)
+    return {
+        "address": device.address,
+        "rssi": device.rssi,
+        "state": asdict(device.state),
+        "operation_queue": device.operation_lock.as_dict(),
+        "last_reap": asdict(last_reap) if (last_reap := device.last_reap) else None,
+        "profiling": data.profiler.as_dict() if data.profiler else None,
+        "loop_lag": loop_lag.as_dict() if data.profiler and loop_lag else None,
+    }
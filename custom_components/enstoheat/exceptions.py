@@ -1,2 +1,6 @@
 class CharacteristicMissingError(Exception):
-    """Raised when a characteristic is missing."""
\ No newline at end of file
+    """Raised when a characteristic is missing."""
+
+
+class OperationSupersededError(Exception):
+    """Raised when a queued operation is made redundant before it runs."""
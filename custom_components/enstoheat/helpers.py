@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import AsyncIterator, Callable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Any
 
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
@@ -13,13 +17,21 @@ from bleak_retry_connector import (
     BleakClientWithServiceCache,
     BleakError,
     BleakNotFoundError,
+    close_stale_connections,
     establish_connection,
+    get_connected_devices,
     retry_bluetooth_connection_error,
 )
 
 from .const import READ_BOOST_CHARACTERISTIC_UUID
-from .exceptions import CharacteristicMissingError
-from .dataclasses import EnstoThermostatState
+from .exceptions import CharacteristicMissingError, OperationSupersededError
+from .operation_lock import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PriorityOperationLock,
+)
+from .dataclasses import ConnectionReapResult, EnstoThermostatState
+from .profiler import KIND_CALLBACK, KIND_HANDLER, KIND_LOCK_WAIT, EnstoProfiler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,23 +39,52 @@ DISCONNECT_DELAY = 120
 DEFAULT_ATTEMPTS = 3
 BLEAK_BACKOFF_TIME = 0.25
 
+SnapshotDecoder = Callable[[bytearray], dict[str, Any]]
+
+
+def decode_real_time_indication(data: bytearray) -> dict[str, Any]:
+    """Decode the real time indication into state fields."""
+    if len(data) < 20:
+        return {}
+    return {
+        "target_temp": (data[1]+256*data[2]) / 10.0,
+        "room_temp": (data[4]+256*data[5]) / 10.0,
+        "floor_temp": (data[4]+256*data[5]) / 10.0,
+    }
+
+
+SNAPSHOT_DECODERS: dict[str, SnapshotDecoder] = {
+    READ_BOOST_CHARACTERISTIC_UUID: decode_real_time_indication,
+}
+
+
 class EnstoThermostatLE:
     def __init__(
-        self, ble_device: BLEDevice, advertisement_data: AdvertisementData | None = None
+        self,
+        ble_device: BLEDevice,
+        advertisement_data: AdvertisementData | None = None,
+        snapshot_decoders: Mapping[str, SnapshotDecoder] | None = None,
     ) -> None:
         """Init the Thermostat."""
         self._ble_device = ble_device
         self._advertisement_data = advertisement_data
-        self._operation_lock = asyncio.Lock()
+        self._operation_lock = PriorityOperationLock()
         self._state = EnstoThermostatState()
         self._connect_lock: asyncio.Lock = asyncio.Lock()
         self._read_char: BleakGATTCharacteristic | None = None
         self._write_char: BleakGATTCharacteristic | None = None
+        self._snapshot_decoders = dict(
+            SNAPSHOT_DECODERS if snapshot_decoders is None else snapshot_decoders
+        )
+        self._snapshot_chars: dict[str, BleakGATTCharacteristic] = {}
         self._disconnect_timer: asyncio.TimerHandle | None = None
+        self._disconnect_tasks: set[asyncio.Task[None]] = set()
+        self._last_reap: ConnectionReapResult | None = None
         self._client: BleakClientWithServiceCache | None = None
         self._expected_disconnect = False
         self.loop = asyncio.get_running_loop()
         self._callbacks: list[Callable[[EnstoThermostatState], None]] = []
+        self._profiler: EnstoProfiler | None = None
 
     @property
     def address(self) -> str:
@@ -67,29 +108,130 @@ class EnstoThermostatLE:
             return self._advertisement_data.rssi
         return None
 
+    def set_ble_device_and_advertisement_data(
+        self, ble_device: BLEDevice, advertisement_data: AdvertisementData
+    ) -> None:
+        """Set the ble device and advertisement data."""
+        self._ble_device = ble_device
+        self._advertisement_data = advertisement_data
+
     @property
     def state(self) -> EnstoThermostatState:
         """Return the state."""
         return self._state
 
+    @property
+    def is_connected(self) -> bool:
+        """Return True if a client is connected."""
+        return bool(self._client and self._client.is_connected)
+
+    @property
+    def last_reap(self) -> ConnectionReapResult | None:
+        """Return the result of the last connection reconcile."""
+        return self._last_reap
+
+    @property
+    def operation_lock(self) -> PriorityOperationLock:
+        """Return the prioritised operation lock."""
+        return self._operation_lock
+
+    @property
+    def profiler(self) -> EnstoProfiler | None:
+        """Return the profiler, if profiling is enabled."""
+        return self._profiler
+
+    def set_profiler(self, profiler: EnstoProfiler | None) -> None:
+        """Enable or disable profiling of the BLE hot path."""
+        self._profiler = profiler
+
 
     async def stop(self) -> None:
         """Stop the EnstoThermostat."""
         _LOGGER.debug("%s: Stop", self.name)
+        self.set_profiler(None)
         await self._execute_disconnect()
+        if tasks := self._cancel_disconnect_tasks():
+            await asyncio.gather(*tasks, return_exceptions=True)
 
 
     def _fire_callbacks(self) -> None:
         """Fire the callbacks."""
+        if not (profiler := self._profiler):
+            for callback in self._callbacks:
+                callback(self._state)
+            return
         for callback in self._callbacks:
-            callback(self._state)
+            name = getattr(callback, "__qualname__", repr(callback))
+            with profiler.measure(KIND_CALLBACK, name):
+                callback(self._state)
+
+    @asynccontextmanager
+    async def _timed_lock(self, lock: asyncio.Lock, name: str) -> AsyncIterator[None]:
+        """Acquire a lock, recording the wait when profiling."""
+        start = time.perf_counter()
+        async with lock:
+            if self._profiler:
+                self._profiler.record(KIND_LOCK_WAIT, name, time.perf_counter() - start)
+            yield
+
+    @asynccontextmanager
+    async def _operation_slot(
+        self, priority: int, droppable: bool = False
+    ) -> AsyncIterator[None]:
+        """Hold the operation lock, recording the wait when profiling."""
+        start = time.perf_counter()
+        async with self._operation_lock.hold(priority, droppable):
+            if self._profiler:
+                self._profiler.record(
+                    KIND_LOCK_WAIT, "operation_lock", time.perf_counter() - start
+                )
+            yield
+
+    async def initialise(self) -> None:
+        """Connect and resolve characteristics."""
+        await self._ensure_connected()
 
     async def update(self) -> None:
         """Update the EnstoThermostat."""
-        await self._ensure_connected()
         _LOGGER.debug("%s: Updating", self.name)
-        data = await self._read_data()
-        self._data_notification_handler(0, data)
+        await self.read_snapshot()
+
+    async def read_snapshot(
+        self, priority: int = PRIORITY_BACKGROUND, droppable: bool = True
+    ) -> EnstoThermostatState:
+        """Read every snapshot characteristic in one locked session.
+
+        The decoded fields are merged into the state in a single step and the
+        callbacks fire once for the whole snapshot. A droppable read is skipped
+        if a notification carrying the same data arrives while it is queued.
+        """
+        await self._ensure_connected()
+        try:
+            values = await self._read_snapshot_while_connected(
+                priority, droppable and self._snapshot_covered_by_notification
+            )
+        except OperationSupersededError:
+            _LOGGER.debug(
+                "%s: Snapshot superseded by a notification; RSSI: %s",
+                self.name,
+                self.rssi,
+            )
+            return self._state
+        fields: dict[str, Any] = {}
+        for uuid, data in values.items():
+            fields.update(self._snapshot_decoders[uuid](data))
+        if fields:
+            self._state = replace(self._state, **fields)
+            _LOGGER.debug(
+                "%s: Snapshot read; RSSI: %s: %s", self.name, self.rssi, self._state
+            )
+            self._fire_callbacks()
+        return self._state
+
+    @property
+    def _snapshot_covered_by_notification(self) -> bool:
+        """Return True if a notification carries everything the snapshot reads."""
+        return self._snapshot_decoders.keys() <= {READ_BOOST_CHARACTERISTIC_UUID}
 
     def register_callback(
         self, callback: Callable[[EnstoThermostatState], None]
@@ -113,7 +255,7 @@ class EnstoThermostatLE:
         if self._client and self._client.is_connected:
             self._reset_disconnect_timer()
             return
-        async with self._connect_lock:
+        async with self._timed_lock(self._connect_lock, "connect_lock"):
             # Check again while holding the lock
             if self._client and self._client.is_connected:
                 self._reset_disconnect_timer()
@@ -144,22 +286,25 @@ class EnstoThermostatLE:
 
 
 
-    def _data_notification_handler(self, _sender: int, data: bytearray) -> None:
+    def _data_notification_handler(self, sender: int, data: bytearray) -> None:
         """Handle notification responses."""
+        if not self._profiler:
+            self._handle_notification(sender, data)
+            return
+        with self._profiler.measure(KIND_HANDLER, "notification"):
+            self._handle_notification(sender, data)
+
+    def _handle_notification(self, _sender: int, data: bytearray) -> None:
+        """Decode a notification and update the state."""
         _LOGGER.debug("%s: Notification received: %s", self.name, data.hex())
 
-        if len(data) < 20:
+        if not (fields := decode_real_time_indication(data)):
             return
 
-        target_temp = (data[1]+256*data[2]) / 10.0
-        room_temp = (data[4]+256*data[5]) / 10.0
-        floor_temp = (data[4]+256*data[5]) / 10.0
+        self._state = replace(self._state, **fields)
 
-        self._state = EnstoThermostatState(
-            target_temp=target_temp,
-            room_temp=room_temp,
-            floor_temp=floor_temp
-        )
+        if dropped := self._operation_lock.drop_superseded():
+            _LOGGER.debug("%s: Dropped %s queued polls", self.name, dropped)
 
         _LOGGER.debug(
             "%s: Notification received; RSSI: %s: %s %s",
@@ -192,11 +337,72 @@ class EnstoThermostatLE:
             self.name,
             self.rssi,
         )
+        if client is self._client:
+            self._release_connection_state()
+
+    def _release_connection_state(self) -> None:
+        """Drop the client, characteristics and pending disconnect timer."""
+        if self._disconnect_timer:
+            self._disconnect_timer.cancel()
+            self._disconnect_timer = None
+        self._client = None
+        self._read_char = None
+        self._write_char = None
+        self._snapshot_chars = {}
 
     def _disconnect(self) -> None:
         """Disconnect from device."""
         self._disconnect_timer = None
-        asyncio.create_task(self._execute_timed_disconnect())
+        task = asyncio.create_task(self._execute_timed_disconnect())
+        self._disconnect_tasks.add(task)
+        task.add_done_callback(self._disconnect_tasks.discard)
+
+    def _cancel_disconnect_tasks(self) -> list[asyncio.Task[None]]:
+        """Cancel timed disconnects that have not finished and return them."""
+        tasks = [task for task in self._disconnect_tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        self._disconnect_tasks.clear()
+        return tasks
+
+    async def reconcile_connection(self) -> ConnectionReapResult:
+        """Reap half-open links and connections the adapter still holds.
+
+        Compares the locally held client with the adapter's view of the link
+        and releases anything that no longer backs a live connection,
+        including timed disconnects left queued behind a link that is gone.
+        """
+        if self._connect_lock.locked():
+            # A connect or disconnect is in flight; let it settle first
+            return ConnectionReapResult(address=self.address)
+
+        async with self._timed_lock(self._connect_lock, "connect_lock"):
+            stale_client = False
+            if self._client is not None and not self._client.is_connected:
+                _LOGGER.debug(
+                    "%s: Reaping half-open client; RSSI: %s", self.name, self.rssi
+                )
+                stale_client = True
+                self._release_connection_state()
+
+            stale_links = 0
+            leaked_tasks = 0
+            if self._client is None:
+                # With no client a queued timed disconnect has nothing to do
+                leaked_tasks = len(self._cancel_disconnect_tasks())
+                # Nothing of ours holds the link, so any connection the adapter
+                # still reports for this device is stale
+                stale_links = len(await get_connected_devices(self._ble_device))
+                if stale_links:
+                    await close_stale_connections(self._ble_device)
+
+        self._last_reap = ConnectionReapResult(
+            address=self.address,
+            stale_client=stale_client,
+            stale_links=stale_links,
+            leaked_tasks=leaked_tasks,
+        )
+        return self._last_reap
 
     async def _execute_timed_disconnect(self) -> None:
         """Execute timed disconnection."""
@@ -209,13 +415,11 @@ class EnstoThermostatLE:
 
     async def _execute_disconnect(self) -> None:
         """Execute disconnection."""
-        async with self._connect_lock:
+        async with self._timed_lock(self._connect_lock, "connect_lock"):
             read_char = self._read_char
             client = self._client
             self._expected_disconnect = True
-            self._client = None
-            self._read_char = None
-            self._write_char = None
+            self._release_connection_state()
             if client and client.is_connected:
                 if read_char:
                     try:
@@ -253,7 +457,9 @@ class EnstoThermostatLE:
 
     async def _execute_command_locked(self, commands: list[bytes]) -> None:
         """Execute command and read response."""
-        assert self._client is not None  # nosec
+        if not self._client or not self._client.is_connected:
+            # The link was released while this operation was queued
+            raise BleakError("Not connected")
         if not self._read_char:
             raise CharacteristicMissingError("Read characteristic missing")
         if not self._write_char:
@@ -261,11 +467,16 @@ class EnstoThermostatLE:
         for command in commands:
             await self._client.write_gatt_char(self._write_char, command, False)
 
-    async def _read_data_locked(self) -> bytearray:
-        assert self._client is not None  # nosec
-        if not self._read_char:
-            raise CharacteristicMissingError("Read characteristic missing")
-        return await self._client.read_gatt_char(self._read_char)
+    async def _read_snapshot_locked(self) -> dict[str, bytearray]:
+        # Capture the session once so a drop mid snapshot fails as a whole
+        client = self._client
+        chars = self._snapshot_chars
+        if not client or not client.is_connected:
+            # The link was released while this operation was queued
+            raise BleakError("Not connected")
+        if not chars:
+            raise CharacteristicMissingError("Snapshot characteristics missing")
+        return {uuid: await client.read_gatt_char(char) for uuid, char in chars.items()}
 
     async def _send_command(
         self, commands: list[bytes] | bytes, retry: int | None = None
@@ -277,27 +488,24 @@ class EnstoThermostatLE:
         await self._send_command_while_connected(commands, retry)
 
 
-    async def _read_data(self) -> bytearray:
-        """Send command to device and read response."""
-        await self._ensure_connected()
-        return await self._read_data_while_connected()
-
-
-    async def _read_data_while_connected(self) -> bytearray:
-        """Send command to device and read response."""
+    async def _read_snapshot_while_connected(
+        self, priority: int = PRIORITY_BACKGROUND, droppable: bool = False
+    ) -> dict[str, bytearray]:
+        """Read all snapshot characteristics while holding the lock once."""
         _LOGGER.debug(
-            "%s: Reading data,",
-            self.name
-       )
+            "%s: Reading snapshot of %s characteristics",
+            self.name,
+            len(self._snapshot_chars),
+        )
         if self._operation_lock.locked():
             _LOGGER.debug(
                 "%s: Operation already in progress, waiting for it to complete; RSSI: %s",
                 self.name,
                 self.rssi,
             )
-        async with self._operation_lock:
+        async with self._operation_slot(priority, droppable):
             try:
-                return await self._read_data_locked()
+                return await self._read_snapshot_locked()
             except BleakNotFoundError:
                 _LOGGER.error(
                     "%s: device not found, no longer in range, or poor RSSI: %s",
@@ -336,7 +544,7 @@ class EnstoThermostatLE:
                 self.name,
                 self.rssi,
             )
-        async with self._operation_lock:
+        async with self._operation_slot(PRIORITY_INTERACTIVE):
             try:
                 await self._send_command_locked(commands)
                 return
@@ -368,5 +576,12 @@ class EnstoThermostatLE:
         """Resolve characteristics."""
         if char := services.get_characteristic(READ_BOOST_CHARACTERISTIC_UUID):
             self._read_char = char
+        for uuid in self._snapshot_decoders:
+            if char := services.get_characteristic(uuid):
+                self._snapshot_chars[uuid] = char
+            else:
+                _LOGGER.debug(
+                    "%s: Snapshot characteristic %s not found", self.name, uuid
+                )
         return bool(self._read_char)
 
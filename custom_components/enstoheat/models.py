@@ -4,6 +4,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from .helpers import EnstoThermostatLE
+from .profiler import EnstoProfiler
 
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
@@ -13,3 +14,4 @@ class ThermostatData:
     title: str
     device: EnstoThermostatLE
     coordinator: DataUpdateCoordinator
+    profiler: EnstoProfiler | None = None
@@ -0,0 +1,147 @@
+"""Prioritised operation lock for Ensto devices."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from .exceptions import OperationSupersededError
+from .profiler import TimingStats
+
+# User initiated operations. Today only service refreshes use this, since the
+# device has no resolved write characteristic for command writes yet.
+PRIORITY_INTERACTIVE = 0
+# Coordinator polls
+PRIORITY_BACKGROUND = 10
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    future: asyncio.Future[None] = field(compare=False)
+    droppable: bool = field(compare=False)
+
+
+@dataclass
+class _WaitStats(TimingStats):
+    """Lock wait timings plus the operations dropped while queued."""
+
+    dropped: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats in milliseconds."""
+        stats = super().as_dict()
+        # Lock waits are never compared against a slow threshold
+        del stats["slow"]
+        return {**stats, "dropped": self.dropped}
+
+
+class PriorityOperationLock:
+    """Lock that hands over to the waiter with the lowest priority value.
+
+    Waiters with the same priority are served first come, first served.
+    Droppable waiters can be released early with OperationSupersededError
+    when their result is no longer needed.
+    """
+
+    def __init__(self) -> None:
+        """Init the lock."""
+        self._locked = False
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        self._stats: dict[int, _WaitStats] = {}
+
+    def locked(self) -> bool:
+        """Return True if the lock is held."""
+        return self._locked
+
+    @property
+    def depth(self) -> int:
+        """Return the number of queued operations."""
+        return sum(not waiter.future.done() for waiter in self._waiters)
+
+    @asynccontextmanager
+    async def hold(
+        self, priority: int, droppable: bool = False
+    ) -> AsyncIterator[None]:
+        """Hold the lock for the duration of the block."""
+        await self.acquire(priority, droppable)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int, droppable: bool = False) -> None:
+        """Acquire the lock, waiting behind higher priority operations."""
+        stats = self._stats.setdefault(priority, _WaitStats())
+        if not self._locked:
+            self._locked = True
+            stats.add(0, False)
+            return
+
+        start = time.perf_counter()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            _Waiter(priority, next(self._sequence), future, droppable),
+        )
+        try:
+            await future
+        except OperationSupersededError:
+            stats.dropped += 1
+            raise
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and not future.exception():
+                # The lock was handed to us just before the cancellation
+                self.release()
+            raise
+        stats.add(time.perf_counter() - start, False)
+
+    def release(self) -> None:
+        """Release the lock and hand it to the next waiter."""
+        if not self._locked:
+            raise RuntimeError("Lock is not acquired")
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+        self._locked = False
+
+    def drop_superseded(self) -> int:
+        """Drop queued droppable operations, returning how many were dropped."""
+        dropped = 0
+        for waiter in self._waiters:
+            if waiter.droppable and not waiter.future.done():
+                waiter.future.set_exception(
+                    OperationSupersededError("Superseded by fresher data")
+                )
+                dropped += 1
+        if dropped:
+            self._waiters = [
+                waiter for waiter in self._waiters if not waiter.future.done()
+            ]
+            heapq.heapify(self._waiters)
+        return dropped
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return queue depth and wait time statistics."""
+        return {
+            "locked": self._locked,
+            "depth": self.depth,
+            "waits": {
+                PRIORITY_NAMES.get(priority, str(priority)): stats.as_dict()
+                for priority, stats in sorted(self._stats.items())
+            },
+        }
@@ -0,0 +1,151 @@
+"""Opt-in profiling of the Ensto BLE hot path."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+LOOP_LAG_SAMPLE_SECONDS = 1.0
+
+KIND_CALLBACK = "callback"
+KIND_HANDLER = "handler"
+KIND_LOCK_WAIT = "lock_wait"
+KIND_REFRESH = "refresh"
+
+# Kinds that measure time spent blocking the event loop; only these are
+# compared against the slow threshold. Lock waits and refreshes are awaited
+# and are recorded for the report only.
+BLOCKING_KINDS = frozenset({KIND_CALLBACK, KIND_HANDLER})
+
+
+@dataclass
+class TimingStats:
+    """Aggregated timings for a single profiled site."""
+
+    count: int = 0
+    total: float = 0
+    max: float = 0
+    last: float = 0
+    slow: int = 0
+
+    def add(self, duration: float, slow: bool) -> None:
+        """Add a sample."""
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        self.max = max(self.max, duration)
+        if slow:
+            self.slow += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats in milliseconds."""
+        return {
+            "count": self.count,
+            "slow": self.slow,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0,
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3),
+            "total_ms": round(self.total * 1000, 3),
+        }
+
+
+class EnstoProfiler:
+    """Record callback, handler, lock wait and refresh timings for a device."""
+
+    def __init__(self, address: str, slow_threshold: float) -> None:
+        """Init the profiler, slow_threshold is in seconds."""
+        self._address = address
+        self._slow_threshold = slow_threshold
+        self._stats: dict[tuple[str, str], TimingStats] = {}
+        self._started = time.monotonic()
+
+    @property
+    def slow_threshold(self) -> float:
+        """Return the slow threshold in seconds."""
+        return self._slow_threshold
+
+    def record(self, kind: str, name: str, duration: float) -> None:
+        """Record a timing sample."""
+        slow = kind in BLOCKING_KINDS and duration >= self._slow_threshold
+        if slow:
+            _LOGGER.warning(
+                "%s: Slow %s %s took %.1f ms",
+                self._address,
+                kind,
+                name,
+                duration * 1000,
+            )
+        self._stats.setdefault((kind, name), TimingStats()).add(duration, slow)
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[None]:
+        """Measure the duration of the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - start)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profiling report."""
+        report: dict[str, Any] = {
+            "address": self._address,
+            "slow_threshold_ms": round(self._slow_threshold * 1000, 3),
+            "uptime_seconds": round(time.monotonic() - self._started, 1),
+        }
+        for (kind, name), stats in sorted(self._stats.items()):
+            report.setdefault(kind, {})[name] = stats.as_dict()
+        return report
+
+
+class LoopLagSampler:
+    """Sample event loop lag once for the whole integration.
+
+    Lag is not caused by any single device, so it is reported separately
+    from the per device profilers and never logged against an address.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Init the sampler."""
+        self._loop = loop
+        self._thresholds: dict[str, float] = {}
+        self._stats = TimingStats()
+        self._handle: asyncio.TimerHandle | None = None
+
+    def add_user(self, user: str, slow_threshold: float) -> None:
+        """Start sampling for a profiled config entry."""
+        self._thresholds[user] = slow_threshold
+        if self._handle is None:
+            self._stats = TimingStats()
+            self._schedule_sample()
+
+    def remove_user(self, user: str) -> None:
+        """Stop sampling once no profiled config entry is left."""
+        self._thresholds.pop(user, None)
+        if not self._thresholds and self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule_sample(self) -> None:
+        """Schedule the next lag sample."""
+        expected = self._loop.time() + LOOP_LAG_SAMPLE_SECONDS
+        self._handle = self._loop.call_at(expected, self._sample, expected)
+
+    def _sample(self, expected: float) -> None:
+        """Record how late the sample fired and reschedule."""
+        lag = max(self._loop.time() - expected, 0)
+        self._stats.add(lag, lag >= min(self._thresholds.values()))
+        self._schedule_sample()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the loop lag report."""
+        return {
+            "sample_seconds": LOOP_LAG_SAMPLE_SECONDS,
+            **self._stats.as_dict(),
+        }
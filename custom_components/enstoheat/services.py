@@ -0,0 +1,163 @@
+"""Integration wide services for the Ensto integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import bluetooth
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_ADDRESSES,
+    ATTR_OPERATION,
+    BULK_ADAPTER_CONCURRENCY,
+    DEVICE_TIMEOUT,
+    DOMAIN,
+    SERVICE_BULK_CONTROL,
+)
+from .models import ThermostatData
+from .operation_lock import PRIORITY_INTERACTIVE
+
+_LOGGER = logging.getLogger(__name__)
+
+UNKNOWN_ADAPTER = "unknown"
+
+
+async def _async_refresh(data: ThermostatData) -> None:
+    """Read a fresh snapshot and push it to the entities."""
+    await data.device.read_snapshot(PRIORITY_INTERACTIVE, droppable=False)
+    data.coordinator.async_update_listeners()
+
+
+async def _async_reconcile(data: ThermostatData) -> None:
+    """Reap stale connection state."""
+    await data.device.reconcile_connection()
+
+
+BULK_OPERATIONS: dict[str, Callable[[ThermostatData], Awaitable[None]]] = {
+    "refresh": _async_refresh,
+    "reconcile": _async_reconcile,
+}
+
+BULK_CONTROL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_OPERATION): vol.In(BULK_OPERATIONS),
+        vol.Optional(ATTR_ADDRESSES): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+
+def _reachability(hass: HomeAssistant, data: ThermostatData) -> tuple[int, int]:
+    """Return a sort key that puts reachable devices first, strongest first."""
+    device = data.device
+    if device.is_connected:
+        rank = 0
+    elif bluetooth.async_address_present(hass, device.address, True):
+        rank = 1
+    else:
+        rank = 2
+    rssi = device.rssi
+    if service_info := bluetooth.async_last_service_info(hass, device.address, True):
+        rssi = service_info.rssi
+    return rank, -(rssi if rssi is not None else -127)
+
+
+def _adapter_source(hass: HomeAssistant, data: ThermostatData) -> str:
+    """Return the adapter currently serving a device."""
+    if service_info := bluetooth.async_last_service_info(
+        hass, data.device.address, True
+    ):
+        return service_info.source
+    return UNKNOWN_ADAPTER
+
+
+async def async_bulk_control(
+    hass: HomeAssistant,
+    targets: list[ThermostatData],
+    operation: Callable[[ThermostatData], Awaitable[None]],
+) -> dict[str, dict[str, Any]]:
+    """Apply an operation to many thermostats with per adapter concurrency."""
+    semaphores: dict[str, asyncio.Semaphore] = {}
+    results: dict[str, dict[str, Any]] = {}
+
+    async def _async_run(data: ThermostatData) -> None:
+        source = _adapter_source(hass, data)
+        semaphore = semaphores.setdefault(
+            source, asyncio.Semaphore(BULK_ADAPTER_CONCURRENCY)
+        )
+        queued = time.monotonic()
+        async with semaphore:
+            started = time.monotonic()
+            error: str | None = None
+            try:
+                async with asyncio.timeout(DEVICE_TIMEOUT):
+                    await operation(data)
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.debug(
+                    "%s: Bulk operation failed", data.device.name, exc_info=True
+                )
+                error = str(ex) or type(ex).__name__
+            results[data.device.address] = {
+                "success": error is None,
+                "error": error,
+                "adapter": source,
+                "wait": round(started - queued, 3),
+                "duration": round(time.monotonic() - started, 3),
+            }
+
+    # Tasks acquire the semaphores in creation order, so reachable devices
+    # get the adapter slots first
+    ordered = sorted(targets, key=lambda data: _reachability(hass, data))
+    await asyncio.gather(*(_async_run(data) for data in ordered))
+    return results
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _async_bulk_control(call: ServiceCall) -> ServiceResponse:
+        """Handle the bulk control service call."""
+        loaded: dict[str, ThermostatData] = {
+            data.device.address.upper(): data
+            for data in hass.data.get(DOMAIN, {}).values()
+        }
+        if ATTR_ADDRESSES in call.data:
+            addresses = list(
+                dict.fromkeys(address.upper() for address in call.data[ATTR_ADDRESSES])
+            )
+            if missing := [address for address in addresses if address not in loaded]:
+                raise ServiceValidationError(
+                    f"Unknown Ensto thermostat address(es): {', '.join(missing)}"
+                )
+            targets = [loaded[address] for address in addresses]
+        else:
+            targets = list(loaded.values())
+
+        started = time.monotonic()
+        results = await async_bulk_control(
+            hass, targets, BULK_OPERATIONS[call.data[ATTR_OPERATION]]
+        )
+        return {
+            "duration": round(time.monotonic() - started, 3),
+            "results": results,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_CONTROL,
+        _async_bulk_control,
+        schema=BULK_CONTROL_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,168 @@
+"""Compact delta stream of thermostat state for websocket subscribers."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_DELTA_STREAM, DOMAIN
+from .dataclasses import EnstoThermostatState
+
+MAX_THROTTLE_SECONDS = 60
+
+
+class _DeltaSubscriber:
+    """Coalesce deltas for one subscriber and flush them at most every throttle."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        send: Callable[[dict[str, Any]], None],
+        throttle: float,
+    ) -> None:
+        """Init the subscriber."""
+        self._loop = loop
+        self._send = send
+        self._throttle = throttle
+        self._pending: dict[str, dict[str, Any] | None] = {}
+        self._seq = 0
+        self._last_sent = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def queue(self, seq: int, address: str, changes: dict[str, Any] | None) -> None:
+        """Queue a delta, flushing now or when the throttle window closes.
+
+        A changes value of None marks the device as removed.
+        """
+        if changes is None or (pending := self._pending.get(address)) is None:
+            self._pending[address] = None if changes is None else dict(changes)
+        else:
+            pending.update(changes)
+        self._seq = seq
+        if self._timer:
+            return
+        delay = self._last_sent + self._throttle - time.monotonic()
+        if delay <= 0:
+            self._flush()
+        else:
+            self._timer = self._loop.call_later(delay, self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        """Send the coalesced deltas."""
+        self._timer = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._last_sent = time.monotonic()
+        self._send({"seq": self._seq, "changes": pending})
+
+    @callback
+    def cancel(self) -> None:
+        """Stop any pending flush."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+
+class EnstoDeltaStream:
+    """Track the last published state per device and fan out field deltas."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init the stream."""
+        self._hass = hass
+        self._seq = 0
+        self._states: dict[str, dict[str, Any]] = {}
+        self._subscribers: set[_DeltaSubscriber] = set()
+
+    @callback
+    def async_publish(self, address: str, state: EnstoThermostatState) -> None:
+        """Publish the fields of state that changed since the last publish."""
+        fields = asdict(state)
+        previous = self._states.get(address, {})
+        changes = {
+            key: value for key, value in fields.items() if previous.get(key) != value
+        }
+        if not changes and address in self._states:
+            return
+        self._seq += 1
+        self._states[address] = fields
+        for subscriber in self._subscribers:
+            subscriber.queue(self._seq, address, changes)
+
+    @callback
+    def async_remove(self, address: str) -> None:
+        """Forget a device that is no longer loaded and tell the subscribers."""
+        if self._states.pop(address, None) is None:
+            return
+        self._seq += 1
+        for subscriber in self._subscribers:
+            subscriber.queue(self._seq, address, None)
+
+    @callback
+    def async_snapshot(self) -> dict[str, Any]:
+        """Return the full state of every device and the current sequence."""
+        return {
+            "seq": self._seq,
+            "snapshot": {
+                address: dict(fields) for address, fields in self._states.items()
+            },
+        }
+
+    @callback
+    def async_subscribe(
+        self, send: Callable[[dict[str, Any]], None], throttle: float
+    ) -> Callable[[], None]:
+        """Subscribe to deltas, returning a callable to unsubscribe."""
+        subscriber = _DeltaSubscriber(self._hass.loop, send, throttle)
+        self._subscribers.add(subscriber)
+
+        @callback
+        def _unsubscribe() -> None:
+            subscriber.cancel()
+            self._subscribers.discard(subscriber)
+
+        return _unsubscribe
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_deltas",
+        vol.Optional("throttle", default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=MAX_THROTTLE_SECONDS)
+        ),
+    }
+)
+@callback
+def websocket_subscribe_deltas(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Send a snapshot followed by sequence numbered state deltas."""
+    stream: EnstoDeltaStream = hass.data[DATA_DELTA_STREAM]
+
+    @callback
+    def _send(payload: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], payload))
+
+    connection.subscriptions[msg["id"]] = stream.async_subscribe(
+        _send, msg["throttle"]
+    )
+    connection.send_result(msg["id"])
+    _send(stream.async_snapshot())
+
+
+@callback
+def async_setup_stream(hass: HomeAssistant) -> None:
+    """Create the delta stream and register the websocket command."""
+    hass.data[DATA_DELTA_STREAM] = EnstoDeltaStream(hass)
+    websocket_api.async_register_command(hass, websocket_subscribe_deltas)